@@ -5,13 +5,38 @@ Biletinial sitesinden tiyatro oyunlarını çeker.
 
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
 import json
+import re
 import time
+from pathlib import Path
 
 BASE_URL = "https://biletinial.com"
 THEATER_URL = f"{BASE_URL}/tr-tr/tiyatro"
 MAX_EVENTS = 150
+REJECTED_URLS_PATH = Path(__file__).parent.parent / 'data' / 'rejected_urls.json'
+REJECTED_URLS_TTL_DAYS = 30
+
+EVENT_LINK_PREFIX = "/tr-tr/tiyatro/"
+LISTING_CARD_SELECTOR = 'article, li, [class*="card"], [class*="item"]'
+LISTING_TITLE_SELECTOR = 'h2, h3, h4, [class*="title"], [class*="baslik"]'
+LISTING_CATEGORY_SELECTOR = '.category, .genre, .badge, .tag, [class*="kategori"], [class*="category"]'
+
+BLOCKLIST = [
+    "konser", "stand-up", "stand up", "workshop",
+    "festival", "atölye", "çocuk"
+]
+
+# Kökle başlayıp yasaklı etkinlik anlamına gelmeyen kelimeler
+BLOCKLIST_EXCEPTIONS = [
+    "konservatuvar", "konservatuar", "çocukluk", "çocukluğ"
+]
+
+# Eşleştirme kuralları değiştiğinde artırılır; önbellekteki eski kayıtlar geçersizleşir
+MATCHER_VERSION = 2
+
+TURKISH_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
 
 
 HEADERS = {
@@ -32,9 +57,112 @@ def get_soup(url: str) -> BeautifulSoup:
         return None
 
 
-def get_theater_events(city: str = "istanbul") -> list:
+def fold_turkish(text: str) -> str:
+    """Metni küçük harfe çevirip Türkçe karakterleri ASCII karşılıklarına indirger."""
+    return text.translate(TURKISH_ASCII).lower()
+
+
+def tokenize(text: str) -> str:
+    """Metni kelimeleri tek boşlukla ayrılmış, katlanmış haline getirir."""
+    return " ".join(re.findall(r"\w+", fold_turkish(text)))
+
+
+def match_blocklist(*texts: str):
+    """Metinlerde kelime başında geçen ilk yasaklı kökü, yoksa None döndürür.
+
+    Türkçe ekler nedeniyle kökten sonra gelen her ek kabul edilir ("konseri",
+    "atölyesi", "çocuklar"); istisna listesindeki kelimeler elenmez.
+    """
+    text = " ".join(tokenize(t) for t in texts if t)
+    exceptions = tuple(tokenize(w) for w in BLOCKLIST_EXCEPTIONS)
+
+    for word in BLOCKLIST:
+        pattern = rf"\b{re.escape(tokenize(word))}\w*"
+        for match in re.finditer(pattern, text):
+            if not match.group(0).split(" ")[-1].startswith(exceptions):
+                return word
+
+    return None
+
+
+BLOCKLIST_VERSION = hashlib.md5(
+    "|".join([str(MATCHER_VERSION), *BLOCKLIST, "", *BLOCKLIST_EXCEPTIONS]).encode()
+).hexdigest()[:8]
+
+
+def load_rejected_urls() -> dict:
+    """Önceki çalıştırmalarda elenen, hâlâ geçerli etkinlik linklerini yükler."""
+    try:
+        with open(REJECTED_URLS_PATH, encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(entries, dict):
+        return {}
+
+    cutoff = datetime.now() - timedelta(days=REJECTED_URLS_TTL_DAYS)
+    rejected = {}
+    for url, entry in entries.items():
+        try:
+            if entry['blocklist_version'] != BLOCKLIST_VERSION:
+                continue
+            if datetime.fromisoformat(entry['rejected_at']) < cutoff:
+                continue
+        except (TypeError, KeyError, ValueError):
+            continue
+        rejected[url] = entry
+
+    return rejected
+
+
+def save_rejected_urls(rejected: dict) -> None:
+    """Elenen etkinlik linklerini sonraki çalıştırmalar için kaydeder."""
+    REJECTED_URLS_PATH.parent.mkdir(exist_ok=True)
+    with open(REJECTED_URLS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(rejected.items())), f, ensure_ascii=False, indent=2)
+
+
+def get_listing_card(a):
+    """Linki saran etkinlik kartını döndürür; net bir kart yoksa None."""
+    card = None
+    for parent in a.parents:
+        if parent.name in ("body", "html", "[document]", "main", "nav", "header", "footer"):
+            break
+        hrefs = {
+            link.get("href") for link in parent.select(f'a[href^="{EVENT_LINK_PREFIX}"]')
+        }
+        if len(hrefs) > 1:
+            break
+        card = parent
+        if parent.css.match(LISTING_CARD_SELECTOR):
+            break
+    return card
+
+
+def get_listing_rejection(href: str, anchors: list):
+    """Aynı etkinliğe ait linklerin slug, başlık ve kategori etiketinden eleme nedenini döndürür."""
+    slug = href.rstrip("/").rsplit("/", 1)[-1]
+    texts = [slug]
+
+    for a in anchors:
+        if not a.select_one(LISTING_TITLE_SELECTOR):
+            texts.append(a.get_text(" ", strip=True))
+        card = get_listing_card(a)
+        if not card:
+            continue
+        for elem in card.select(f"{LISTING_TITLE_SELECTOR}, {LISTING_CATEGORY_SELECTOR}"):
+            texts.append(elem.get_text(" ", strip=True))
+
+    return match_blocklist(*texts)
+
+
+def get_theater_events(city: str = "istanbul", rejected_urls: dict = None) -> list:
     events = []
     seen_links = set()
+    rejected_urls = rejected_urls or {}
+    cached = 0
+    skipped = 0
 
     for page in range(1, 11):
         url = f"{THEATER_URL}?city={city}&page={page}"
@@ -44,20 +172,31 @@ def get_theater_events(city: str = "istanbul") -> list:
         if not soup:
             break
 
-        links = soup.select('a[href^="/tr-tr/tiyatro/"]')
+        links = soup.select(f'a[href^="{EVENT_LINK_PREFIX}"]')
 
         print(f"  → {len(links)} link bulundu")
 
+        anchors_by_href = {}
         for a in links:
             href = a.get("href")
-            if not href:
-                continue
+            if href:
+                anchors_by_href.setdefault(href, []).append(a)
 
+        for href, anchors in anchors_by_href.items():
             full_url = BASE_URL + href
             if full_url in seen_links:
                 continue
 
             seen_links.add(full_url)
+
+            if full_url in rejected_urls:
+                cached += 1
+                continue
+
+            if get_listing_rejection(href, anchors):
+                skipped += 1
+                continue
+
             events.append({
                 "detail_url": full_url,
                 "source": "biletinial"
@@ -65,29 +204,17 @@ def get_theater_events(city: str = "istanbul") -> list:
 
         time.sleep(1)
 
+    print(f"💾 {cached} etkinlik önceki çalıştırmalarda elendiği için atlandı")
+    print(f"🚫 {skipped} etkinlik liste aşamasında elendi")
     print(f"📋 Toplam {len(events)} benzersiz etkinlik linki bulundu")
     return events
 
 
-def is_valid_event(title, category):
-    BLOCKLIST = [
-        "konser", "stand-up", "stand up", "workshop",
-        "festival", "atölye", "çocuk"
-    ]
+def get_event_details(event_url: str, rejected_urls: dict = None) -> dict:
+    """Tek bir etkinliğin detaylarını çeker.
 
-    text = f"{title} {category}".lower()
-
-    for word in BLOCKLIST:
-        if word in text:
-            return False
-
-    return True
-
-
-
-
-def get_event_details(event_url: str) -> dict:
-    """Tek bir etkinliğin detaylarını çeker."""
+    Yasaklı listeye takılan etkinlikler verilirse `rejected_urls` içine nedeniyle kaydedilir.
+    """
     soup = get_soup(event_url)
     if not soup:
         return None
@@ -129,6 +256,16 @@ def get_event_details(event_url: str) -> dict:
         if venue:
             details['venue'] = venue.get_text(strip=True)
         
+        reason = match_blocklist(details.get("title", ""), details.get("category", ""))
+        if reason:
+            if rejected_urls is not None:
+                rejected_urls[event_url] = {
+                    'reason': reason,
+                    'blocklist_version': BLOCKLIST_VERSION,
+                    'rejected_at': datetime.now().isoformat(),
+                }
+            return None
+
         details['dates_and_locations'] = parse_biletinial_showtimes(soup)
 
         if not details['dates_and_locations']:
@@ -136,10 +273,6 @@ def get_event_details(event_url: str) -> dict:
         
         if not details.get("title") or not details.get("venue"):
             return None
-        
-
-        if not is_valid_event(details.get("title", ""), details.get("category", "")):
-            return None
 
     except Exception as e:
         print(f"⚠️ Detay işlenirken hata: {event_url} - {e}")
@@ -186,7 +319,8 @@ def scrape_istanbul_theater() -> list:
     """İstanbul'daki tüm tiyatro etkinliklerini çeker."""
     print("🎭 Biletinial İstanbul tiyatro etkinlikleri çekiliyor...")
     
-    events = get_theater_events(city="istanbul")
+    rejected_urls = load_rejected_urls()
+    events = get_theater_events(city="istanbul", rejected_urls=rejected_urls)
     print(f"📋 Toplam {len(events)} etkinlik bulundu")
     
     detailed_events = []
@@ -196,7 +330,7 @@ def scrape_istanbul_theater() -> list:
             
         print(f"🔍 [{i}/{len(events)}] {event['detail_url']}")
         
-        details = get_event_details(event['detail_url'])
+        details = get_event_details(event['detail_url'], rejected_urls)
         if details:
             for k, v in event.items():
                 if k == "title":
@@ -207,6 +341,8 @@ def scrape_istanbul_theater() -> list:
         
         time.sleep(0.3)
     
+    save_rejected_urls(rejected_urls)
+
     print(f"✅ {len(detailed_events)} etkinlik detayı başarıyla çekildi")
     return detailed_events
 